@@ -1,11 +1,13 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import interview, user, auth
+from .routers import interview, user, auth, search
 from .database import engine
 from . import models
 
 # Initialize the FastAPI application
-app = FastAPI()
+# ORJSONResponse is used as the default response class because orjson serializes JSON much faster than the standard library
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Add CORS (Cross-Origin Resource Sharing) middleware to the application
 # This allows your API to be accessed by frontend applications hosted on different domains
@@ -27,10 +29,11 @@ app.add_middleware(
 models.Base.metadata.create_all(bind=engine)
 
 # Include the routers for different parts of the application
-# This registers the routes defined in the interview, user, and auth modules with the FastAPI app
+# This registers the routes defined in the interview, user, auth, and search modules with the FastAPI app
 app.include_router(interview.router)
 app.include_router(user.router)
 app.include_router(auth.router)
+app.include_router(search.router)
 
 # Define a simple root endpoint to verify that the API is working
 @app.get("/")
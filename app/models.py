@@ -55,6 +55,10 @@ class Interview(Base):
     # This creates a one-to-many relationship where an interview can have multiple conversation entries
     conversations = relationship("Conversation", back_populates="interview", cascade="all, delete-orphan")
 
+    # Relationship to the InterviewEmbedding model
+    # This creates a one-to-one relationship holding the embedding used for semantic search
+    embedding = relationship("InterviewEmbedding", back_populates="interview", uselist=False, cascade="all, delete-orphan")
+
 # Define the Conversation model, which represents individual interactions within an interview
 class Conversation(Base):
     __tablename__ = "conversations"  # The name of the table in the database
@@ -69,3 +73,15 @@ class Conversation(Base):
     # Relationship to the Interview model
     # This creates a many-to-one relationship where each conversation entry belongs to one interview
     interview = relationship("Interview", back_populates="conversations")
+
+# Define the InterviewEmbedding model, which stores the semantic search embedding of an interview
+class InterviewEmbedding(Base):
+    __tablename__ = "interview_embeddings"  # The name of the table in the database
+
+    # Define the columns in the interview_embeddings table
+    interview_id = Column(Integer, ForeignKey('interviews.id'), primary_key=True)  # Foreign key linking to the Interview model
+    embedding = Column(LargeBinary)  # Normalized float32 embedding of the interview's searchable text
+
+    # Relationship to the Interview model
+    # This creates a one-to-one relationship where each embedding belongs to one interview
+    interview = relationship("Interview", back_populates="embedding")
@@ -31,7 +31,7 @@ class Token(BaseModel):
     token: str
 
 # Route to handle Google login using the OAuth2 token provided by the frontend
-@router.post("/google")
+@router.post("/google", response_model=schemas.AccessToken)
 def google_login(token: Token, db: Session = Depends(get_db)):
     try:
         # Verify the OAuth2 token with Google's API
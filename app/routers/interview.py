@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
-from .. import models, schemas
+from sqlalchemy.orm import Session, selectinload
+from .. import models, schemas, search
 from ..database import get_db
 from .auth import get_current_user 
 import openai
@@ -25,40 +25,46 @@ router = APIRouter(
     tags=["interview"]
 )
 
+# Structure an interview for the response, matching schemas.Interview
+# Only plain column values and question texts are read, so serialization never has to inspect the ORM object
+def interview_data(interview: models.Interview):
+    return {
+        "id": interview.id,
+        "title": interview.title,
+        "description": interview.description,
+        "questions": [q.text for q in interview.questions],
+        "taken": interview.taken,  # Indicates if the interview has been taken
+        "score": interview.score   # The score obtained in the interview
+    }
+
 # Placeholder route to verify the interview service
-@router.get("/")
+@router.get("/", response_model=schemas.Message)
 def get_interview():
     return {"message": "This is where the interview data will be returned."}
 
 # Endpoint to submit interview answers, returns the submitted data
-@router.post("/submit")
+@router.post("/submit", response_model=schemas.SubmitResponse)
 def submit_interview(answers: dict):
     return {"message": "Interview submitted successfully!", "answers": answers}
 
 # Endpoint to fetch interviews specific to the logged-in user
-@router.get("/user-interviews")
+@router.get("/user-interviews", response_model=List[schemas.Interview])
 def get_user_interviews(db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     # Query the database for interviews associated with the current user
-    interviews = db.query(models.Interview).filter(models.Interview.user_id == user.id).all()
-    
+    # The questions are loaded in one extra query instead of one lazy load per interview
+    interviews = (
+        db.query(models.Interview)
+        .options(selectinload(models.Interview.questions))
+        .filter(models.Interview.user_id == user.id)
+        .all()
+    )
+
     # Structure the interview data to be returned in the response
-    interviews_data = [
-        {
-            "id": interview.id,
-            "title": interview.title,
-            "description": interview.description,
-            "questions": [q.text for q in interview.questions],  # Assuming a relationship to questions exists
-            "taken": interview.taken,  # Indicates if the interview has been taken
-            "score": interview.score   # The score obtained in the interview
-        }
-        for interview in interviews
-    ]
-    
-    return interviews_data
+    return [interview_data(interview) for interview in interviews]
 
 # Endpoint to create a new interview for a user
-@router.post("/create", status_code=status.HTTP_201_CREATED)
-def create_interview(interview: schemas.InterviewCreate, db: Session = Depends(get_db)):
+@router.post("/create", status_code=status.HTTP_201_CREATED, response_model=schemas.InterviewResponse)
+def create_interview(interview: schemas.InterviewCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     try:
         # Check if the user exists based on the provided email
         user = db.query(models.User).filter(models.User.email == interview.email).first()
@@ -85,7 +91,10 @@ def create_interview(interview: schemas.InterviewCreate, db: Session = Depends(g
 
         db.commit()
 
-        return {"message": "Interview created successfully", "interview": new_interview}
+        # Add the new interview to the search index once the response has been sent
+        background_tasks.add_task(search.index_interview, db.get_bind(), new_interview.id)
+
+        return {"message": "Interview created successfully", "interview": interview_data(new_interview)}
     
     except ValidationError as e:
         # Handle validation errors from Pydantic models
@@ -102,28 +111,16 @@ def create_interview(interview: schemas.InterviewCreate, db: Session = Depends(g
         )
 
 # Endpoint to retrieve all interviews in the database (not user-specific)
-@router.get("/all")
+@router.get("/all", response_model=List[schemas.Interview])
 def get_all_interviews(db: Session = Depends(get_db)):
-    # Query the database for all interviews
-    interviews = db.query(models.Interview).all()
-    
+    # Query the database for all interviews, loading their questions in one extra query
+    interviews = db.query(models.Interview).options(selectinload(models.Interview.questions)).all()
+
     # Structure the interview data for the response
-    interviews_data = [
-        {
-            "id": interview.id,
-            "title": interview.title,
-            "description": interview.description,
-            "questions": [q.text for q in interview.questions],  # Assuming a relationship to questions exists
-            "taken": interview.taken,  # Indicates if the interview has been taken
-            "score": interview.score,   # The score obtained in the interview
-        }
-        for interview in interviews
-    ]
-    
-    return interviews_data
+    return [interview_data(interview) for interview in interviews]
 
 # Endpoint to retrieve a specific interview by ID for the logged-in user
-@router.get("/{interview_id}")
+@router.get("/{interview_id}", response_model=schemas.Interview)
 def get_interview_by_id(interview_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     # Query the database for the interview with the given ID belonging to the current user
     interview = db.query(models.Interview).filter(models.Interview.id == interview_id, models.Interview.user_id == user.id).first()
@@ -131,19 +128,11 @@ def get_interview_by_id(interview_id: int, db: Session = Depends(get_db), user:
         raise HTTPException(status_code=404, detail="Interview not found")
 
     # Structure the interview data for the response
-    interview_data = {
-        "id": interview.id,
-        "title": interview.title,
-        "description": interview.description,
-        "questions": [q.text for q in interview.questions],  # Assuming a relationship to questions exists
-        "taken": interview.taken,  # Indicates if the interview has been taken
-        "score": interview.score   # The score obtained in the interview
-    }
-    return interview_data
+    return interview_data(interview)
 
 # Endpoint to update an existing interview
-@router.put("/update/{interview_id}")
-def update_interview(interview_id: int, interview: schemas.InterviewUpdate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+@router.put("/update/{interview_id}", response_model=schemas.InterviewResponse)
+def update_interview(interview_id: int, interview: schemas.InterviewUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     # Query the database for the interview with the given ID belonging to the current user
     existing_interview = db.query(models.Interview).filter(models.Interview.id == interview_id, models.Interview.user_id == user.id).first()
     if not existing_interview:
@@ -169,11 +158,14 @@ def update_interview(interview_id: int, interview: schemas.InterviewUpdate, db:
     db.commit()
     db.refresh(existing_interview)
 
-    return {"message": "Interview updated successfully", "interview": existing_interview}
+    # Update the interview in the search index with its new title, description and questions once the response has been sent
+    background_tasks.add_task(search.index_interview, db.get_bind(), existing_interview.id)
+
+    return {"message": "Interview updated successfully", "interview": interview_data(existing_interview)}
 
 # Endpoint to delete an interview by ID
 @router.delete("/delete/{interview_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_interview(interview_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+def delete_interview(interview_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     # Query the database for the interview with the given ID belonging to the current user
     interview = db.query(models.Interview).filter(models.Interview.id == interview_id, models.Interview.user_id == user.id).first()
     if not interview:
@@ -186,10 +178,13 @@ def delete_interview(interview_id: int, db: Session = Depends(get_db), user: mod
     db.delete(interview)
     db.commit()
 
+    # Remove the interview from the search index once the response has been sent
+    background_tasks.add_task(search.index_interview, db.get_bind(), interview_id)
+
     return {"message": "Interview deleted successfully"}
 
 # Endpoint to generate a follow-up question using GPT-3.5
-@router.post("/gpt-followup")
+@router.post("/gpt-followup", response_model=schemas.GPTFollowupResponse)
 def gpt_followup(gpt_request: schemas.GPTFollowupRequest):
     try:
         # Prompt GPT-3.5 to generate a follow-up question based on the previous question and answer
@@ -221,8 +216,8 @@ def gpt_followup(gpt_request: schemas.GPTFollowupRequest):
         raise HTTPException(status_code=500, detail=f"An error occurred while communicating with GPT: {str(e)}")
 
 # Endpoint to submit a full conversation with the AI interviewer
-@router.post("/submit-conversation")
-def submit_conversation(request: schemas.ConversationCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+@router.post("/submit-conversation", response_model=schemas.ConversationResult)
+def submit_conversation(request: schemas.ConversationCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     # Find the corresponding interview in the database
     interview = db.query(models.Interview).filter(models.Interview.id == request.interview_id, models.Interview.user_id == user.id).first()
     if not interview:
@@ -264,8 +259,17 @@ def submit_conversation(request: schemas.ConversationCreate, db: Session = Depen
         interview.score = score
         interview.taken = True
         interview.recording = recording_data  # Store the binary recording data
+
+        # Store the conversation entries so the answers can be searched later
+        interview.conversations = [
+            models.Conversation(question=q, answer=a, timestamp=timestamp)
+            for q, a, timestamp in request.conversation
+        ]
         db.commit()
 
+        # Update the interview in the search index with the submitted answers once the response has been sent
+        background_tasks.add_task(search.index_interview, db.get_bind(), interview.id)
+
         logger.info(f"Interview ID {request.interview_id} updated successfully in the database.")
 
         return {"message": "Interview submitted successfully", "score": score}
@@ -279,7 +283,7 @@ def submit_conversation(request: schemas.ConversationCreate, db: Session = Depen
         raise HTTPException(status_code=500, detail=f"An error occurred while processing the conversation: {str(e)}")
 
 # Endpoint to generate an introductory message using GPT-3.5
-@router.post("/gpt-intro")
+@router.post("/gpt-intro", response_model=schemas.GPTIntroResponse)
 def gpt_intro(interview_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     # Find the corresponding interview in the database
     interview = db.query(models.Interview).filter(models.Interview.id == interview_id, models.Interview.user_id == user.id).first()
@@ -317,7 +321,7 @@ def gpt_intro(interview_id: int, db: Session = Depends(get_db), user: models.Use
         raise HTTPException(status_code=500, detail=f"An error occurred while generating the introduction: {str(e)}")
 
 # Endpoint to generate an outro message using GPT-3.5
-@router.post("/gpt-outro")
+@router.post("/gpt-outro", response_model=schemas.GPTOutroResponse)
 def gpt_outro(interview_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
     # Find the corresponding interview in the database
     interview = db.query(models.Interview).filter(models.Interview.id == interview_id, models.Interview.user_id == user.id).first()
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List
+from .. import models, schemas, search
+from ..database import get_db
+from .auth import get_current_user
+from .interview import interview_data
+
+# Create a FastAPI router with a prefix and tags for the search-related routes
+router = APIRouter(
+    prefix="/search",
+    tags=["search"]
+)
+
+# Endpoint to search the logged-in user's interviews by title, description, questions and conversation answers
+# mode="text" uses full-text search (Postgres tsvector or the in-process inverted index)
+# mode="semantic" ranks by embedding similarity and requires sentence-transformers to be installed
+@router.get("/interviews", response_model=List[schemas.InterviewSearchResult])
+def search_interviews(
+    q: str = Query(..., min_length=1),
+    mode: str = Query("text", pattern="^(text|semantic)$"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    try:
+        results = search.search_interviews(db, q, user_id=user.id, mode=mode, limit=limit)
+    except search.SearchNotMigrated as e:
+        # The Postgres search columns and indexes have not been created on this database yet
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except ImportError:
+        # The semantic mode depends on an optional package that is not installed on this server
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Semantic search is not available: install sentence-transformers to enable it"
+        )
+
+    # Structure the matching interviews for the response, best match first
+    return [{**interview_data(interview), "relevance": relevance} for interview, relevance in results]
@@ -42,3 +42,52 @@ class ConversationCreate(BaseModel):
     interview_id: int  
     conversation: List[Tuple[str, str, int]] 
     recording: Optional[bytes] = None 
+
+# Model for representing an interview in responses
+class Interview(BaseModel):
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    questions: List[str]
+    taken: Optional[bool] = None
+    score: Optional[int] = None
+
+# Model for the response of creating or updating an interview
+class InterviewResponse(BaseModel):
+    message: str
+    interview: Interview
+
+# Model for an interview returned by search, with its relevance for the query
+class InterviewSearchResult(Interview):
+    relevance: float
+
+# Model for responses that only carry a message
+class Message(BaseModel):
+    message: str
+
+# Model for the response of submitting interview answers
+class SubmitResponse(BaseModel):
+    message: str
+    answers: dict
+
+# Model for the GPT follow-up response
+class GPTFollowupResponse(BaseModel):
+    followup_question: str
+
+# Model for the GPT introduction response
+class GPTIntroResponse(BaseModel):
+    introduction: str
+
+# Model for the GPT outro response
+class GPTOutroResponse(BaseModel):
+    outro: str
+
+# Model for the result of submitting a conversation, including the score given by GPT
+class ConversationResult(BaseModel):
+    message: str
+    score: int
+
+# Model for the access token returned after logging in
+class AccessToken(BaseModel):
+    access_token: str
+    token_type: str
@@ -0,0 +1,406 @@
+import heapq
+import importlib.util
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from sqlalchemy import exists, func, literal_column, select, text, union_all
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.exc import IntegrityError, ProgrammingError
+from sqlalchemy.orm import Session, selectinload
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration used for the Postgres tsvector columns and queries
+SEARCH_CONFIG = "english"
+
+# Text stored as a generated tsvector column ("search_vector") on each Postgres table, see create_search_indexes
+SEARCH_DOCUMENTS = {
+    "interviews": "coalesce(title, '') || ' ' || coalesce(description, '')",
+    "questions": "coalesce(text, '')",
+    "conversations": "coalesce(answer, '')",
+}
+
+# Plain indexes needed to scope each search to one user's interviews
+SCOPE_INDEXES = {
+    "ix_interviews_user_id": "interviews (user_id)",
+    "ix_questions_interview_id": "questions (interview_id)",
+    "ix_conversations_interview_id": "conversations (interview_id)",
+}
+
+# Name of the local sentence-transformers model used for semantic search (optional dependency)
+EMBEDDING_MODEL = os.getenv('SEARCH_EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+
+# Semantic search is enabled when sentence-transformers is installed
+SEMANTIC_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+# Regular expression used to split text into lowercase word tokens for the in-process index
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Raised when Postgres search runs before the search migration (`python -m app.search`) was applied
+class SearchNotMigrated(Exception):
+    pass
+
+# Split a piece of text into lowercase tokens
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+# In-process inverted index used when the database has no native full-text search (e.g. SQLite)
+# Each token maps to the interviews containing it and the number of occurrences, scored with BM25
+class InvertedIndex:
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # token -> {interview_id: term frequency}
+        self.doc_tokens = {}  # interview_id -> Counter of tokens, needed to remove old postings on update
+        self.doc_owner = {}  # interview_id -> user_id, used to scope results to the current user
+        self.doc_length = {}  # interview_id -> number of tokens
+        self.total_length = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_tokens)
+
+    # Add or replace an interview in the index
+    def add(self, interview_id, user_id, text):
+        counts = Counter(tokenize(text))
+        with self.lock:
+            self._discard(interview_id)
+            for token, tf in counts.items():
+                self.postings[token][interview_id] = tf
+            self.doc_tokens[interview_id] = counts
+            self.doc_owner[interview_id] = user_id
+            self.doc_length[interview_id] = sum(counts.values())
+            self.total_length += self.doc_length[interview_id]
+
+    # Add or replace interviews given as (interview_id, user_id, text) tuples
+    def add_many(self, docs):
+        for interview_id, user_id, text in docs:
+            self.add(interview_id, user_id, text)
+
+    # Remove an interview from the index
+    def remove(self, interview_id):
+        with self.lock:
+            self._discard(interview_id)
+
+    def _discard(self, interview_id):
+        counts = self.doc_tokens.pop(interview_id, None)
+        if counts is None:
+            return
+        for token in counts:
+            docs = self.postings[token]
+            docs.pop(interview_id, None)
+            if not docs:
+                del self.postings[token]
+        self.doc_owner.pop(interview_id, None)
+        self.total_length -= self.doc_length.pop(interview_id)
+
+    # Return (interview_id, score) pairs ranked by BM25, optionally restricted to one user's interviews
+    def search(self, query, user_id=None, limit=20):
+        tokens = set(tokenize(query))
+        with self.lock:
+            n_docs = len(self.doc_tokens)
+            if not tokens or not n_docs:
+                return []
+            k1, b = self.k1, self.b
+            avg_length = self.total_length / n_docs
+            doc_length, doc_owner = self.doc_length, self.doc_owner
+            scores = defaultdict(float)
+            for token in tokens:
+                docs = self.postings.get(token)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for interview_id, tf in docs.items():
+                    if user_id is not None and doc_owner[interview_id] != user_id:
+                        continue
+                    norm = k1 * (1 - b + b * doc_length[interview_id] / avg_length)
+                    scores[interview_id] += idf * tf * (k1 + 1) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+# Check whether the session is bound to a database with native full-text search
+def uses_postgres(db: Session):
+    return db.get_bind().dialect.name == "postgresql"
+
+# Load (interview_id, user_id, text) for the interviews matching the given conditions, ordered by id
+# The text joins the title, description, questions and conversation answers of each interview
+# Plain column queries are used instead of ORM objects so that large tables can be indexed quickly
+def _load_docs(db: Session, *conditions, limit=None):
+    rows = db.execute(
+        select(models.Interview.id, models.Interview.user_id, models.Interview.title, models.Interview.description)
+        .where(*conditions)
+        .order_by(models.Interview.id)
+        .limit(limit)
+    ).all()
+    if not rows:
+        return []
+    ids = [row.id for row in rows]
+    parts = {row.id: [row.title, row.description] for row in rows}
+    for column in (models.Question.text, models.Conversation.answer):
+        table = column.class_
+        for interview_id, text in db.execute(
+            select(table.interview_id, column)
+            .where(table.interview_id.in_(ids))
+            .order_by(table.id)
+        ):
+            parts[interview_id].append(text)
+    return [(row.id, row.user_id, " ".join(p for p in parts[row.id] if p)) for row in rows]
+
+# Load the (user_id, text) of one interview, or None if it does not exist (anymore)
+def _load_doc(db: Session, interview_id):
+    docs = _load_docs(db, models.Interview.id == interview_id)
+    return docs[0][1:] if docs else None
+
+# Load the searchable text of every interview in batches
+def _iter_interview_docs(db: Session, batch_size=500):
+    last_id = 0
+    while True:
+        docs = _load_docs(db, models.Interview.id > last_id, limit=batch_size)
+        if not docs:
+            return
+        yield docs
+        last_id = docs[-1][0]
+
+# Wraps an in-process index that is built from the database on first use and then kept up to date on every write
+# Each write re-reads the interview from the database under a lock, so concurrent writes to the same interview
+# always leave its latest text indexed. Writes that happen while the build is running are queued and replayed
+# once it finishes, so an interview changed or deleted after the build read it is never left stale.
+# The index lives in one process: with several workers, each keeps its own copy and only sees the writes it served,
+# so this fallback is meant for single-process development servers.
+class LazyIndex:
+    def __init__(self, index):
+        self.index = index
+        self.ready = False
+        self.building = False
+        self.pending = set()  # Ids of interviews written while the build is running
+        self.build_lock = threading.Lock()  # Held for the whole build so only one build runs at a time
+        self.state_lock = threading.Lock()  # Protects ready, building and pending, and orders the writes
+
+    def ensure(self, db: Session):
+        if self.ready:
+            return
+        with self.build_lock:
+            if self.ready:
+                return
+            with self.state_lock:
+                self.building = True
+            try:
+                for docs in _iter_interview_docs(db):
+                    self.index.add_many(docs)
+            except Exception:
+                with self.state_lock:
+                    self.building = False
+                    self.pending = set()
+                raise
+            # Replay the writes queued during the build, then switch to direct updates
+            with self.state_lock:
+                for interview_id in self.pending:
+                    self._refresh(db, interview_id)
+                self.pending = set()
+                self.ready = True
+                self.building = False
+
+    def _refresh(self, db: Session, interview_id):
+        doc = _load_doc(db, interview_id)
+        if doc is None:
+            self.index.remove(interview_id)
+        else:
+            self.index.add(interview_id, *doc)
+
+    # Bring one interview up to date after it was created, changed or deleted
+    def refresh(self, db: Session, interview_id):
+        with self.state_lock:
+            if self.building:
+                self.pending.add(interview_id)
+            elif self.ready:
+                self._refresh(db, interview_id)
+
+# Process-wide in-process text index, used when the database has no native full-text search
+text_index = LazyIndex(InvertedIndex())
+
+# Embedding model, loaded on first use in each process
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+# Serializes the check-and-write of embeddings within a process (Postgres also locks the interview row)
+_embedding_write_lock = threading.Lock()
+
+# Load the embedding model; raises ImportError if sentence-transformers is not installed
+def load_embedding_model():
+    global _embedding_model
+    with _embedding_model_lock:
+        if _embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+            _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+    return _embedding_model
+
+# Encode texts as normalized float32 vectors
+def encode(texts):
+    return load_embedding_model().encode(texts, normalize_embeddings=True, show_progress_bar=False).astype("float32")
+
+# Compute and store the embedding of one interview
+# The embedding is only written if the interview text did not change while it was being encoded,
+# checked under a lock on the interview row, so a slower, older update never overwrites a newer one
+def _store_embedding(db: Session, interview_id):
+    doc = _load_doc(db, interview_id)
+    while doc is not None:
+        vector = encode([doc[1]])[0]
+        with _embedding_write_lock:
+            db.query(models.Interview.id).filter(models.Interview.id == interview_id).with_for_update().first()
+            current = _load_doc(db, interview_id)
+            if current == doc:
+                db.merge(models.InterviewEmbedding(interview_id=interview_id, embedding=vector.tobytes()))
+                db.commit()
+                return
+            db.rollback()
+        doc = current
+    # Deleted interviews lose their embedding through the ORM cascade, so there is nothing left to do
+
+# Update the search indexes after an interview (or its questions/conversations) was created, changed or deleted
+# Runs as a background task after the response is sent, with its own session; failures are logged and never
+# affect the request. Postgres keeps its generated search columns up to date itself.
+def index_interview(engine, interview_id):
+    db = Session(bind=engine)
+    try:
+        text_index.refresh(db, interview_id)
+        if SEMANTIC_AVAILABLE:
+            _store_embedding(db, interview_id)
+    except Exception:
+        logger.exception(f"Failed to update the search index for interview ID {interview_id}")
+    finally:
+        db.close()
+
+# Stored tsvector column of a Postgres table, created by create_search_indexes
+def _search_vector(table):
+    return literal_column(f"{table}.search_vector", TSVECTOR)
+
+# Rank interviews with Postgres full-text search over the GIN-indexed search_vector columns
+def _postgres_search(db: Session, query, user_id, limit):
+    ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), query)
+    interview_vector = _search_vector("interviews")
+    question_vector = _search_vector("questions")
+    conversation_vector = _search_vector("conversations")
+
+    # Score each source separately so every match can use its own index, then add up the ranks per interview
+    # The user filter is applied inside every branch so only the current user's rows are matched and ranked
+    branches = [
+        select(models.Interview.id.label("interview_id"), func.ts_rank(interview_vector, ts_query).label("rank"))
+        .where(interview_vector.op("@@")(ts_query)),
+        select(models.Question.interview_id, func.ts_rank(question_vector, ts_query))
+        .join(models.Interview, models.Interview.id == models.Question.interview_id)
+        .where(question_vector.op("@@")(ts_query)),
+        select(models.Conversation.interview_id, func.ts_rank(conversation_vector, ts_query))
+        .join(models.Interview, models.Interview.id == models.Conversation.interview_id)
+        .where(conversation_vector.op("@@")(ts_query)),
+    ]
+    if user_id is not None:
+        branches = [branch.where(models.Interview.user_id == user_id) for branch in branches]
+    matches = union_all(*branches).subquery()
+
+    ranked = (
+        select(matches.c.interview_id, func.sum(matches.c.rank).label("score"))
+        .group_by(matches.c.interview_id)
+        .order_by(func.sum(matches.c.rank).desc())
+        .limit(limit)
+    )
+    try:
+        rows = db.execute(ranked).all()
+    except ProgrammingError as e:
+        # 42703 is Postgres' undefined_column error: the search_vector columns have not been added yet
+        if getattr(e.orig, "pgcode", None) != "42703":
+            raise
+        db.rollback()
+        raise SearchNotMigrated("The search migration has not been applied: run `python -m app.search`") from e
+    return [(row.interview_id, float(row.score)) for row in rows]
+
+# Rank interviews by cosine similarity between the query and the stored interview embeddings
+def _semantic_search(db: Session, query, user_id, limit):
+    import numpy
+
+    query_vector = encode([query])[0]
+    stored = select(models.InterviewEmbedding.interview_id, models.InterviewEmbedding.embedding).join(models.Interview)
+    if user_id is not None:
+        stored = stored.where(models.Interview.user_id == user_id)
+    rows = db.execute(stored).all()
+    if not rows:
+        return []
+    matrix = numpy.frombuffer(b"".join(row.embedding for row in rows), dtype=numpy.float32).reshape(len(rows), -1)
+    scores = matrix @ query_vector
+    best = numpy.argsort(-scores)[:limit]
+    return [(rows[i].interview_id, float(scores[i])) for i in best]
+
+# Search interviews by keyword ("text" mode) or by embedding similarity ("semantic" mode)
+# Returns (interview, score) pairs ordered from best to worst match
+def search_interviews(db: Session, query, user_id=None, mode="text", limit=20):
+    if mode == "semantic":
+        hits = _semantic_search(db, query, user_id, limit)
+    elif uses_postgres(db):
+        hits = _postgres_search(db, query, user_id, limit)
+    else:
+        text_index.ensure(db)
+        hits = text_index.index.search(query, user_id=user_id, limit=limit)
+
+    if not hits:
+        return []
+    interviews = (
+        db.query(models.Interview)
+        .options(selectinload(models.Interview.questions))
+        .filter(models.Interview.id.in_([interview_id for interview_id, _ in hits]))
+        .all()
+    )
+    by_id = {interview.id: interview for interview in interviews}
+    return [(by_id[interview_id], score) for interview_id, score in hits if interview_id in by_id]
+
+# Add the generated search_vector columns and their GIN indexes to a Postgres database
+# This is a one-off migration, run with `python -m app.search`, not something to do at application startup:
+# adding a stored generated column rewrites the table, so run it during a maintenance window.
+# The indexes are built CONCURRENTLY so they do not block writes; every statement is idempotent,
+# so the migration can be re-run (drop any index left INVALID by a failed concurrent build first).
+def create_search_indexes(engine):
+    if engine.dialect.name != "postgresql":
+        return
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table, document in SEARCH_DOCUMENTS.items():
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}'::regconfig, {document})) STORED"
+            ))
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_search ON {table} USING gin (search_vector)"))
+        for name, columns in SCOPE_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {columns}"))
+
+# Store embeddings for all interviews that do not have one yet, in batches
+# Part of the search migration; returns the number of interviews embedded
+def backfill_embeddings(engine, batch_size=256):
+    if not SEMANTIC_AVAILABLE:
+        return 0
+    models.InterviewEmbedding.__table__.create(bind=engine, checkfirst=True)
+    missing = ~exists().where(models.InterviewEmbedding.interview_id == models.Interview.id)
+    count = 0
+    with Session(bind=engine) as db:
+        while True:
+            docs = _load_docs(db, missing, limit=batch_size)
+            if not docs:
+                return count
+            vectors = encode([text for _, _, text in docs])
+            db.add_all([
+                models.InterviewEmbedding(interview_id=interview_id, embedding=vector.tobytes())
+                for (interview_id, _, _), vector in zip(docs, vectors)
+            ])
+            try:
+                db.commit()
+                count += len(docs)
+            except IntegrityError:
+                # An interview was embedded by the application or deleted meanwhile; the next batch query skips it
+                db.rollback()
+
+if __name__ == "__main__":
+    from .database import engine
+    logging.basicConfig(level=logging.INFO)
+    create_search_indexes(engine)
+    logger.info(f"Stored embeddings for {backfill_embeddings(engine)} interviews")
@@ -0,0 +1,106 @@
+# Benchmark of /search query latency over a large number of interviews
+# Usage: python -m benchmarks.search_bench [--database-url URL] [--interviews 100000] [--users 1000] [--mode text|semantic]
+# The database is seeded with synthetic users, interviews, questions and answers the first time it is used,
+# and queries are scoped to one user like the /search/interviews endpoint.
+import argparse
+import itertools
+import random
+import statistics
+import time
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+from app import models, search
+
+# Vocabulary used to generate synthetic interview text
+WORDS = (
+    "python java rust golang backend frontend database postgres cloud azure kubernetes docker "
+    "leadership teamwork conflict deadline mentoring design architecture scaling caching latency "
+    "testing debugging security oauth api rest graphql react typescript machine learning model "
+    "pipeline analytics product roadmap customer stakeholder agile sprint incident outage migration"
+).split()
+
+# Word frequencies follow a Zipf distribution over the real words above plus a long tail of filler terms
+VOCABULARY = WORDS + [f"term{i}" for i in range(20000)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+QUERIES = ["python backend", "kubernetes scaling", "conflict with stakeholder", "postgres migration", "react typescript testing"]
+
+def sentence(rng, n):
+    return " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=n))
+
+# Insert synthetic users and interviews with three questions and three answers each, in batches
+# Interviews are spread evenly over the users
+def seed(engine, count, users, batch_size=5000):
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        existing_users = conn.execute(select(func.count(models.User.id))).scalar()
+        if existing_users < users:
+            conn.execute(insert(models.User), [
+                {"id": u, "username": f"bench{u}", "email": f"bench{u}@example.com"} for u in range(existing_users + 1, users + 1)
+            ])
+        existing = conn.execute(select(func.count(models.Interview.id))).scalar()
+        for start in range(existing, count, batch_size):
+            ids = range(start + 1, min(start + batch_size, count) + 1)
+            conn.execute(insert(models.Interview), [
+                {"id": i, "title": sentence(rng, 4), "description": sentence(rng, 12), "user_id": i % users + 1} for i in ids
+            ])
+            conn.execute(insert(models.Question), [
+                {"interview_id": i, "text": sentence(rng, 10)} for i in ids for _ in range(3)
+            ])
+            conn.execute(insert(models.Conversation), [
+                {"interview_id": i, "question": sentence(rng, 10), "answer": sentence(rng, 30), "timestamp": 0} for i in ids for _ in range(3)
+            ])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite:///search_bench.db")
+    parser.add_argument("--interviews", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--mode", default="text", choices=["text", "semantic"])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    models.Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+    seed(engine, args.interviews, args.users)
+    print(f"seeded {args.interviews} interviews for {args.users} users in {time.perf_counter() - started:.1f}s")
+
+    # Run the search migration after seeding (it is idempotent) and refresh the planner statistics
+    started = time.perf_counter()
+    search.create_search_indexes(engine)
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+        print(f"search migration in {time.perf_counter() - started:.1f}s")
+    if args.mode == "semantic":
+        # Embeddings are stored by the migration's backfill, not built by the first query
+        started = time.perf_counter()
+        embedded = search.backfill_embeddings(engine)
+        print(f"embedding backfill of {embedded} interviews in {time.perf_counter() - started:.1f}s")
+
+    # Query as the first bench user, like the endpoint does for the logged-in user
+    user_id = 1
+    db = sessionmaker(bind=engine)()
+    try:
+        # The first query builds the in-process index on SQLite (and loads the model in semantic mode); time it separately
+        started = time.perf_counter()
+        search.search_interviews(db, QUERIES[0], user_id=user_id, mode=args.mode)
+        print(f"backend: {engine.dialect.name}, user {user_id}, mode {args.mode}")
+        print(f"first query (includes index build): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                search.search_interviews(db, query, user_id=user_id, mode=args.mode)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(f"{query!r:32} median {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
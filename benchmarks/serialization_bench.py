@@ -0,0 +1,56 @@
+# Micro-benchmark of the per-response serialization cost of a list of interviews
+# Usage: python -m benchmarks.serialization_bench [--items 1000] [--repeat 200]
+# "before" follows FastAPI's path for handlers without a response model (jsonable_encoder + JSONResponse),
+# "after" follows the path used now (validation and serialization by the response model + ORJSONResponse).
+import argparse
+import statistics
+import time
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from app import models, schemas
+from app.routers.interview import interview_data
+
+def make_interviews(count):
+    return [
+        models.Interview(
+            id=i,
+            title=f"Interview {i}",
+            description="Backend engineer interview covering APIs, databases and system design",
+            taken=i % 2 == 0,
+            score=i % 100,
+            questions=[models.Question(text=f"Question {n} for interview {i}") for n in range(5)],
+        )
+        for i in range(count)
+    ]
+
+def before(data):
+    return JSONResponse(jsonable_encoder(data)).body
+
+def after(data, adapter=TypeAdapter(List[schemas.Interview])):
+    return ORJSONResponse(adapter.dump_python(adapter.validate_python(data), mode="json")).body
+
+def measure(serialize, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serialize(data)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    data = [interview_data(interview) for interview in make_interviews(args.items)]
+    before_ms = measure(before, data, args.repeat)
+    after_ms = measure(after, data, args.repeat)
+    print(f"{args.items} interviews, median per response")
+    print(f"before (jsonable_encoder + JSONResponse): {before_ms:7.2f} ms")
+    print(f"after  (response model + ORJSONResponse): {after_ms:7.2f} ms  ({before_ms / after_ms:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()